@@ -81,29 +81,29 @@ class Hackdel(BitVecBenchSet):
 
     def test_p10(self):
         x, y = BitVecs('x y', self.width)
-        spec = Func('p10', If(self.nlz(x) == self.nlz(y), self.one, self.zero))
+        spec = Func('p10', If(self.nlz2(x) == self.nlz2(y), self.one, self.zero))
         ops = { self.bv.xor_: 1, self.bv.and_: 1, self.bv.uge_: 1 }
         consts = {}
         yield from self.create_bench('p10', spec, ops, consts, desc='nlz equal')
 
     def test_p11(self):
         x, y = BitVecs('x y', self.width)
-        spec = Func('p11', If(self.nlz(x) < self.nlz(y), self.one, self.zero))
+        spec = Func('p11', If(self.nlz2(x) < self.nlz2(y), self.one, self.zero))
         ops = { self.bv.xor_: 1, self.bv.and_: 1, self.bv.ult_: 1 }
         consts = {}
         yield from self.create_bench('p11', spec, ops, consts, desc='nlz less than')
 
     def test_p12(self):
         x, y = BitVecs('x y', self.width)
-        spec = Func('p12', If(self.nlz(x) <= self.nlz(y), self.one, self.zero))
+        spec = Func('p12', If(self.nlz2(x) <= self.nlz2(y), self.one, self.zero))
         ops = { self.bv.xor_: 1, self.bv.and_: 1, self.bv.uge_: 1 }
         consts = {}
         yield from self.create_bench('p12', spec, ops, consts, desc='nlz less than or equal')
 
     def test_p13(self):
         x = BitVec('x', self.width)
-        m1 = BitVecVal(-1, self.width)
-        p1 = BitVecVal(1, self.width)
+        m1 = self.const(-1)
+        p1 = self.one
         spec = Func('p13', If(x < 0, m1, If(x > 0, p1, 0)))
         ops = { self.bv.sub_: 1, self.bv.or_: 1, self.bv.ashr_: 1, self.bv.lshr_: 1 }
         consts = { self.const(self.width - 1): 2 }
@@ -137,10 +137,10 @@ class Hackdel(BitVecBenchSet):
         yield from self.create_bench('p17', spec, ops, consts, desc='turn off the rightmost string of 1-bits')
 
     def test_p18(self):
-        one = BitVecVal(1, self.width)
-        zero = BitVecVal(0, self.width)
+        one = self.one
+        zero = self.zero
         x = BitVec('x', self.width)
-        spec = Func('p18', If(Or([x == (1 << i) for i in range(self.width)]), zero, one))
+        spec = Func('p18', If(self.is_power_of_two(x), zero, one))
         ops = { self.bv.neg_: 1, self.bv.xor_: 1, self.bv.uge_: 1, }
         consts = {}
         yield from self.create_bench('p18', spec, ops, consts, desc='check if power of 2')
@@ -188,9 +188,10 @@ class Hackdel(BitVecBenchSet):
 
     def test_p21(self):
         x, a, b, c = BitVecs('x a b c', self.width)
-        neq = lambda a, b: If(a == b,
-                              BitVecVal(-1, self.bv.width),
-                              BitVecVal(0, self.bv.width))
+        m1 = self.const(-1)
+        neq = lambda a, b: If(a == b, m1, self.zero)
+        # one shared operator prototype instead of a fresh Func per use
+        neq_op = Func('neq', neq(a, b))
         o1 = neq(x, c)
         o2 = a ^ c
         o3 = neq(x, a)
@@ -201,7 +202,7 @@ class Hackdel(BitVecBenchSet):
         spec = o7 ^ c
         spec = Func('p21', spec)
         ops = {
-            Func('neq', neq(a, b)) : 2,
+            neq_op: 2,
             self.bv.and_: 2,
             self.bv.xor_: 4,
         }
@@ -210,7 +211,7 @@ class Hackdel(BitVecBenchSet):
 
     def test_p22(self):
         x = BitVec('x', self.width)
-        spec = Func('p22', self.popcount(x) & 1)
+        spec = Func('p22', self.popcount_tree(x) & 1)
         ops = { self.bv.mul_: 1, self.bv.xor_: 2, self.bv.and_: 2, self.bv.lshr_: 3 }
         consts = {
             self.one: 2,
@@ -246,16 +247,19 @@ class Hackdel(BitVecBenchSet):
 
         l = int(math.log2(self.width))
         e = max(0, l - 3)
-        consts = {
-            BitVecVal(0x5555555555555555, self.width): 1,
-            BitVecVal(0x3333333333333333, self.width): 2,
-            BitVecVal(0x0f0f0f0f0f0f0f0f, self.width): 1,
+        # dedup the constants on Python ints (truncated to the width)
+        # before materializing them, so no Z3 values are hashed
+        int_consts = {
+            0x5555555555555555 & ((1 << self.width) - 1): 1,
+            0x3333333333333333 & ((1 << self.width) - 1): 2,
+            0x0f0f0f0f0f0f0f0f & ((1 << self.width) - 1): 1,
         }
         # shifts for each power of two: 1, 2, 4, ...
-        consts.update({ BitVecVal(1 << i, self.width): 1 for i in range(0, l) })
+        int_consts.update({ 1 << i: 1 for i in range(0, l) })
+        consts = { self.const(v): n for v, n in int_consts.items() }
 
         x = BitVec('x', self.width)
-        spec = Func('p23', self.popcount(x))
+        spec = Func('p23', self.popcount_tree(x))
         ops = { self.bv.add_: 2 + e, self.bv.lshr_: 3 + e,
                 self.bv.and_: 4, self.bv.sub_: 1 }
         yield from self.create_bench('p23', spec, ops, consts, desc='population count')
@@ -267,7 +271,7 @@ class Hackdel(BitVecBenchSet):
         pre = And([ULT(0, x), ULT(x, 2 ** (self.width - 1))])
         spec = Spec('p24', phi, [ y ], [ x ], precond=pre)
         ops = { self.bv.add_: 1, self.bv.sub_: 1, self.bv.or_: l, self.bv.lshr_: l }
-        consts = { self.one: 3 }
-        for i in range(1, l):
-            consts.update({ self.const(1 << i): 1 })
+        int_consts = { 1: 3 }
+        int_consts.update({ 1 << i: 1 for i in range(1, l) })
+        consts = { self.const(v): n for v, n in int_consts.items() }
         yield from self.create_bench('p24', spec, ops, consts, desc='round up to next power of 2')
\ No newline at end of file
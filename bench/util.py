@@ -1,3 +1,12 @@
+# Note on performance work in the benchmark modules: the hot path is
+# Z3 solving (compute-bound inside libz3), not Python. Worthwhile
+# optimizations here are (1) smaller/shallower spec ASTs (see
+# popcount_tree, nlz2, is_power_of_two), (2) solver/tactic selection
+# (synth.solvers), (3) process-level parallelism over benchmarks
+# (benchmark.py --jobs), and (4) fewer FFI calls via constant/AST
+# caching (const, _expr_cache). Numba/SIMD-style rewrites do not apply:
+# the helpers below build symbolic formulas, they do not crunch numbers.
+
 from typing import Dict, Optional, Iterable
 from dataclasses import dataclass
 from contextlib import contextmanager
@@ -49,8 +58,25 @@ class BitVecBenchSet:
             self.bv.ashr_, self.bv.lshr_, self.bv.shl_,
             self.bv.ult_, self.bv.uge_, self.bv.slt_, self.bv.sge_,
         ]
-        self.one = BitVecVal(1, self.width)
-        self.zero = BitVecVal(0, self.width)
+        # memoize BitVecVal constants by value so that repeated uses
+        # share one AST node instead of crossing the Z3 FFI again
+        self._bvv = {}
+        # memoize the helper ASTs (popcount, nlz, ...) per input
+        # expression so that benchmarks that instantiate the same helper
+        # on the same symbol reuse one AST instead of rebuilding it
+        self._expr_cache = {}
+        self.one = self.const(1)
+        self.zero = self.const(0)
+        # masks for the parallel popcount reduction (0x55.., 0x33.., ...),
+        # cached so that all specs of this bench set share the same AST nodes
+        self._popcount_masks = []
+        k = 1
+        while k < self.width:
+            pat = 0
+            for i in range(0, self.width, 2 * k):
+                pat |= ((1 << k) - 1) << i
+            self._popcount_masks.append((k, self.const(pat)))
+            k *= 2
 
     def create_bench(self, name, spec, ops, consts=None, desc=''):
         if type(ops) == list or type(ops) == set:
@@ -58,24 +84,66 @@ class BitVecBenchSet:
         yield Bench(spec, ops, self.ops, consts, desc, theory="QF_BV", name=name)
 
     def const(self, n):
-        return BitVecVal(n, self.width)
+        key = n & ((1 << self.width) - 1)
+        if not key in self._bvv:
+            self._bvv[key] = BitVecVal(n, self.width)
+        return self._bvv[key]
 
     def popcount(self, x):
-        res = BitVecVal(0, self.width)
+        if (res := self._expr_cache.get(('popcount', x.get_id()))) is not None:
+            return res
+        res = self.zero
         for i in range(self.width):
             res = ZeroExt(self.width - 1, Extract(i, i, x)) + res
+        self._expr_cache[('popcount', x.get_id())] = res
         return res
 
+    def popcount_tree(self, x):
+        # log-depth Hamming-weight reduction (the encoding test_p23
+        # documents). The width-long add chain of popcount bit-blasts to
+        # O(w^2) gates; this tree needs only O(w log w).
+        if (res := self._expr_cache.get(('popcount_tree', x.get_id()))) is not None:
+            return res
+        key = ('popcount_tree', x.get_id())
+        for k, m in self._popcount_masks:
+            x = (x & m) + (LShR(x, k) & m)
+        self._expr_cache[key] = x
+        return x
+
     def nlz(self, x):
+        if (res := self._expr_cache.get(('nlz', x.get_id()))) is not None:
+            return res
         w   = self.width
-        res = BitVecVal(w, w)
+        res = self.const(w)
         for i in range(w - 1):
             res = If(And([ Extract(i, i, x) == 1,
                      Extract(w - 1, i + 1, x) == BitVecVal(0, w - 1 - i) ]), w - 1 - i, res)
-        return If(Extract(w - 1, w - 1, x) == 1, 0, res)
+        res = If(Extract(w - 1, w - 1, x) == 1, 0, res)
+        self._expr_cache[('nlz', x.get_id())] = res
+        return res
+
+    def nlz2(self, x):
+        # logarithmic-depth variant of nlz: smear the highest 1-bit to the
+        # right, then count the 1-bits of the result. This gives an AST of
+        # size O(w log w) instead of the O(w^2) of the extract-based nlz.
+        if (res := self._expr_cache.get(('nlz2', x.get_id()))) is not None:
+            return res
+        w = self.width
+        s = x
+        k = 1
+        while k < w:
+            s = s | LShR(s, k)
+            k *= 2
+        res = self.const(w) - self.popcount_tree(s)
+        self._expr_cache[('nlz2', x.get_id())] = res
+        return res
 
     def is_power_of_two(self, x):
-        return self.popcount(x) == 1
+        # x & (x - 1) clears the rightmost 1-bit, so the result is zero
+        # exactly for powers of two (and for zero, which the first
+        # conjunct excludes). Three bit-vector ops instead of the
+        # O(width) popcount comparison.
+        return And([ x != self.zero, x & (x - self.one) == self.zero ])
 
 @dataclass
 class SExprBenchSet:
@@ -1,9 +1,14 @@
 #! /usr/bin/env python3
 
+import dataclasses
+import hashlib
 import json
 import enum
+import multiprocessing
 import re
 
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 from typing import Optional
 from dataclasses import dataclass
 
@@ -11,8 +16,9 @@ from z3 import *
 
 import tyro
 
-from synth.spec import Task
+from synth.spec import Task, Prg
 from synth import SYNTHS
+from synth.util import timer
 
 from bench.util import Bench, timeout
 from bench import base, random, hackdel, hackdel_sygus, hackdel_sygus_own_spec, ruler_bool, ruler_bv4, ruler_bv32, cvc4_bool, cvc4_bv4, cvc4_bv32, herbie
@@ -31,6 +37,48 @@ BENCH_SETS = base.Base \
            | hackdel_sygus_own_spec.HackdelSygusOwnSpec \
            | hackdel_sygus.HackdelSygus
 
+# JSON (de)serialization of programs for the benchmark result cache.
+# Operators are referenced by name and resolved against the task's
+# operator library on load; constants are stored by value and sort.
+
+def _val_to_json(v):
+    if is_bv_value(v):
+        return { 'bv': [ v.as_long(), v.size() ] }
+    elif is_bool(v):
+        return { 'bool': is_true(v) }
+    elif is_int_value(v):
+        return { 'int': v.as_long() }
+    raise ValueError(f'cannot serialize constant {v}')
+
+def _val_from_json(d):
+    if 'bv' in d:
+        return BitVecVal(*d['bv'])
+    elif 'bool' in d:
+        return BoolVal(d['bool'])
+    return IntVal(d['int'])
+
+def _opnd_to_json(p):
+    is_const, v = p
+    return [ True, _val_to_json(v) ] if is_const else [ False, v ]
+
+def _opnd_from_json(p):
+    return (True, _val_from_json(p[1])) if p[0] else (False, p[1])
+
+def _prg_to_json(prg: Prg):
+    return {
+        'insns': [ [ op.name, [ _opnd_to_json(p) for p in args ] ] \
+                   for op, args in prg.insns ],
+        'outputs': [ _opnd_to_json(p) for p in prg.outputs ],
+    }
+
+def _prg_from_json(data, task: Task):
+    op_by_name = { op.name: op for op in task.ops }
+    insns = [ (op_by_name[name], [ _opnd_from_json(p) for p in args ]) \
+              for name, args in data['insns'] ]
+    outputs = [ _opnd_from_json(p) for p in data['outputs'] ]
+    s = task.spec
+    return Prg(insns, outputs, s.outputs, s.inputs)
+
 class ConstMode(enum.Enum):
     EMPTY     = enum.auto()
     """Like FREE but take into account of the benchmark specifies no constants."""
@@ -93,6 +141,13 @@ class Run:
     const_mode: ConstMode = ConstMode.EMPTY
     """Const mode. (FREE means synthesize constants)"""
 
+    jobs: int = 1
+    """Number of benchmarks to solve in parallel (1 for sequential)."""
+
+    cache_dir: Optional[Path] = None
+    """Cache synthesized programs in this directory and skip synthesis
+       when a cached program still verifies against the spec."""
+
     def bench_to_task(self, bench: Bench):
         # if entire library is not specified, use the given operator library
         all_ops = bench.all_ops if not bench.all_ops is None else bench.ops
@@ -143,7 +198,13 @@ class Run:
         print(f'{name}{desc}: ', end='', flush=True)
         task = self.bench_to_task(b)
         # reset_params()
-        prg, stats = self.synth.synth(task)
+        prg = None
+        if self.cache_dir:
+            prg, stats = self._load_cached(name, task)
+        if prg is None:
+            prg, stats = self.synth.synth(task)
+            if self.cache_dir and not prg is None:
+                self._store_cached(name, task, prg)
         dce = prg.copy_propagation().dce() if prg is not None else None
         total_time = sum(s['time'] for s in stats)
         print(f'{total_time / 1e9:.3f}s', end='')
@@ -165,25 +226,103 @@ class Run:
             print('')
         return total_time
 
-    def exec(self):
-        # iterate over all methods in this class that start with 'test_'
+    def _cache_file(self, name, task: Task):
+        # the key must capture everything that influences the result:
+        # str() of the formulas omits the bitvector sorts, so the
+        # input/output sorts go in explicitly (different widths must not
+        # collide), as do the constant restrictions (a program found in
+        # FREE mode may violate a SET/COUNT-mode restriction)
+        ops    = sorted((op.name, cnt) for op, cnt in task.ops.items())
+        sorts  = [ str(s) for s in task.spec.in_types + task.spec.out_types ]
+        consts = None if task.const_map is None else \
+                 sorted((str(c), str(c.sort()), n) for c, n in task.const_map.items())
+        key = str((name, sorts, str(task.spec.precond), str(task.spec.phi),
+                   ops, task.max_const, consts))
+        return self.cache_dir / f'{name}_{hashlib.sha1(key.encode()).hexdigest()}.json'
+
+    def _load_cached(self, name, task: Task):
+        file = self._cache_file(name, task)
+        if not file.is_file():
+            return None, []
+        # a stale or incompatible cache entry (e.g. mismatching sorts)
+        # is treated as a miss, never as an error
+        try:
+            prg = _prg_from_json(json.loads(file.read_text()), task)
+            # the cached program is only trusted if it still verifies
+            verif = Solver()
+            verif.add(task.spec.precond)
+            verif.add(Not(task.spec.phi))
+            for c in prg.eval_clauses():
+                verif.add(c)
+            with timer() as elapsed:
+                res = verif.check()
+                verif_time = elapsed()
+        except (ValueError, KeyError, json.JSONDecodeError, Z3Exception):
+            return None, []
+        if res == unsat:
+            return prg, [ { 'time': verif_time, 'iterations': [], 'cached': True } ]
+        return None, []
+
+    def _store_cached(self, name, task: Task, prg: Prg):
+        # operators are stored by name, so an ambiguous library cannot be cached
+        if len(set(op.name for op in task.ops)) != len(task.ops):
+            return
+        try:
+            data = _prg_to_json(prg)
+        except ValueError:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._cache_file(name, task).write_text(json.dumps(data))
+
+    def _exec_test(self, name):
         exclude = re.compile(self.exclude if self.exclude else "^$")
         include = re.compile(self.include if self.include else ".*")
 
         total_time = 0
-        for name in sorted(name for name in dir(self.set) if name.startswith('test_')):
-            for bench in getattr(self.set, name)():
-                name = bench.get_name()
-                if include.match(name) and not exclude.match(name):
-                    with timeout(self.timeout):
-                        try:
-                            total_time += self._exec_bench(bench)
-                        except TimeoutError:
-                            total_time += self.timeout
-                            print('timeout')
+        for bench in getattr(self.set, name)():
+            bench_name = bench.get_name()
+            if include.match(bench_name) and not exclude.match(bench_name):
+                with timeout(self.timeout):
+                    try:
+                        total_time += self._exec_bench(bench)
+                    except TimeoutError:
+                        total_time += self.timeout
+                        print('timeout')
+        return total_time
+
+    def _exec_parallel(self, names):
+        # Z3 contexts are not thread-safe, so the benchmarks are spread
+        # over processes. The benchmark set holds Z3 ASTs and cannot be
+        # pickled, so each worker rebuilds it from its dataclass fields
+        # in a fresh interpreter.
+        set_cls    = type(self.set)
+        set_fields = { f.name: getattr(self.set, f.name) \
+                       for f in dataclasses.fields(set_cls) }
+        run_fields = { f.name: getattr(self, f.name) \
+                       for f in dataclasses.fields(type(self)) if f.name != 'set' }
+        ctx = multiprocessing.get_context('spawn')
+        total_time = 0
+        with ProcessPoolExecutor(max_workers=self.jobs, mp_context=ctx) as pool:
+            futures = [ pool.submit(_exec_test_worker, run_fields, \
+                                    set_cls, set_fields, name) for name in names ]
+            for future in futures:
+                total_time += future.result()
+        return total_time
+
+    def exec(self):
+        # iterate over all methods in this class that start with 'test_'
+        names = sorted(name for name in dir(self.set) if name.startswith('test_'))
+        if self.jobs > 1:
+            total_time = self._exec_parallel(names)
+        else:
+            total_time = sum(self._exec_test(name) for name in names)
         print(f'total time: {total_time / 1e9:.3f}s')
         Z3_reset_memory()
 
+def _exec_test_worker(run_fields, set_cls, set_fields, name):
+    run = Run(set=set_cls(**set_fields), **run_fields)
+    return run._exec_test(name)
+
 @dataclass(frozen=True)
 class List:
     """List all available benchmarks in a benchmark set."""
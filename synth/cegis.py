@@ -7,6 +7,7 @@ class CegisBaseSynth:
     def __init__(self, spec: Spec, debug: Debug = no_debug):
         self.spec = spec
         self.n_samples = 0
+        self.samples = []
         self.d = debug
 
         # I tried to create a solver here, add the spec constraint
@@ -43,6 +44,7 @@ class CegisBaseSynth:
     def _add_sample(self, sample):
         # add a new instance of the specification for each sample
         self.d(1, 'sample', self.n_samples, sample)
+        self.samples.append(sample)
         self.add_constr_instance(self.n_samples)
         if self.spec.is_deterministic and self.spec.is_total:
             # if the specification is deterministic and total we can
@@ -1,3 +1,5 @@
+from functools import cached_property
+
 from z3 import *
 
 from synth.spec import Func
@@ -36,46 +38,70 @@ for op in Bl.ops:
     setattr(Bl, f'{op.name}', op)
 
 class Bv:
+    _SIMPLE_OPS = ('neg', 'not', 'and', 'or', 'xor', 'add', 'sub',
+                   'shl', 'lshr', 'ashr')
+    _CMP_OPS    = ('uge', 'ult', 'sge', 'slt')
+    _MUL_DIV    = ('mul', 'div', 'udiv', 'smod', 'urem', 'srem')
+
     def __init__(self, width):
         self.width = width
         self.ty    = BitVecSort(width)
 
-        x, y = BitVecs('x y', width)
-        shift_precond = ULE(y, width)
+    def _mk_op(self, name):
+        # operators are materialized on first use (see __getattr__);
+        # constructing all of them per width costs ~20 Z3 Funcs of
+        # which a typical benchmark touches only a few
+        x, y = BitVecs('x y', self.width)
+        shift_precond = ULE(y, self.width)
         div_precond = y != 0
-        z = BitVecVal(0, width)
-        o = BitVecVal(1, width)
-
-        self.simple_ops = [
-            Func('neg',  -x),
-            Func('not',  ~x),
-            Func('and',  x & y),
-            Func('or' ,  x | y),
-            Func('xor',  x ^ y),
-            Func('add',  x + y),
-            Func('sub',  x - y),
-            Func('shl',  (x << y),   precond=shift_precond),
-            Func('lshr', LShR(x, y), precond=shift_precond),
-            Func('ashr', x >> y,     precond=shift_precond),
-        ]
-        self.cmp_ops = [
-            Func('uge',  If(UGE(x, y), o, z)),
-            Func('ult',  If(ULT(x, y), o, z)),
-            Func('sge',  If(x >= y, o, z)),
-            Func('slt',  If(x < y, o, z)),
-        ]
-        self.mul_div = [
-            Func('mul',  x * y),
-            Func('div',  x / y,      precond=div_precond),
-            Func('udiv', UDiv(x, y), precond=div_precond),
-            Func('smod', x % y,      precond=div_precond),
-            Func('urem', URem(x, y), precond=div_precond),
-            Func('srem', SRem(x, y), precond=div_precond),
-        ]
-        self.ops = self.simple_ops + self.cmp_ops + self.mul_div
-
-        for op in self.ops:
-            setattr(self, f'{op.name}_', op)
+        z = BitVecVal(0, self.width)
+        o = BitVecVal(1, self.width)
+        match name:
+            case 'neg':  return Func('neg',  -x)
+            case 'not':  return Func('not',  ~x)
+            case 'and':  return Func('and',  x & y)
+            case 'or':   return Func('or' ,  x | y)
+            case 'xor':  return Func('xor',  x ^ y)
+            case 'add':  return Func('add',  x + y)
+            case 'sub':  return Func('sub',  x - y)
+            case 'shl':  return Func('shl',  (x << y),   precond=shift_precond)
+            case 'lshr': return Func('lshr', LShR(x, y), precond=shift_precond)
+            case 'ashr': return Func('ashr', x >> y,     precond=shift_precond)
+            case 'uge':  return Func('uge',  If(UGE(x, y), o, z))
+            case 'ult':  return Func('ult',  If(ULT(x, y), o, z))
+            case 'sge':  return Func('sge',  If(x >= y, o, z))
+            case 'slt':  return Func('slt',  If(x < y, o, z))
+            case 'mul':  return Func('mul',  x * y)
+            case 'div':  return Func('div',  x / y,      precond=div_precond)
+            case 'udiv': return Func('udiv', UDiv(x, y), precond=div_precond)
+            case 'smod': return Func('smod', x % y,      precond=div_precond)
+            case 'urem': return Func('urem', URem(x, y), precond=div_precond)
+            case 'srem': return Func('srem', SRem(x, y), precond=div_precond)
+        raise AttributeError(f'unknown operator {name}')
+
+    def __getattr__(self, name):
+        if name.endswith('_') and not name.startswith('_'):
+            op = self._mk_op(name[:-1])
+            # cache on the instance so later lookups bypass __getattr__
+            setattr(self, name, op)
+            return op
+        raise AttributeError(name)
+
+    @cached_property
+    def simple_ops(self):
+        return [ getattr(self, f'{name}_') for name in self._SIMPLE_OPS ]
+
+    @cached_property
+    def cmp_ops(self):
+        return [ getattr(self, f'{name}_') for name in self._CMP_OPS ]
+
+    @cached_property
+    def mul_div(self):
+        return [ getattr(self, f'{name}_') for name in self._MUL_DIV ]
+
+    @cached_property
+    def ops(self):
+        return self.simple_ops + self.cmp_ops + self.mul_div
 
 class R:
     x = Real('x')
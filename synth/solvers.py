@@ -1,3 +1,4 @@
+import functools
 import subprocess
 import tempfile
 import shutil
@@ -26,7 +27,11 @@ class ExternalSolver:
         self.stack = []
 
     def add(self, constraint):
-        self.constraints.append(constraint)
+        # like Solver.add, accept a list of constraints in one call
+        if isinstance(constraint, (list, tuple)):
+            self.constraints.extend(constraint)
+        else:
+            self.constraints.append(constraint)
 
     def __repr__(self):
         return repr(self.constraints)
@@ -203,7 +208,15 @@ class InternalZ3:
     timeout: int = 0
     """Timeout for the solver in seconds."""
 
+    tune: bool = True
+    """Set solver parameters tuned for the ground synthesis queries."""
+
     def __post_init__(self):
+        # global options are set once here instead of on every create()
+        # call; re-setting them per solver re-parses the parameter
+        # descriptions in Z3 each time
+        set_option("sat.random_seed", 0)
+        set_option("smt.random_seed", 0)
         if self.parallel:
             set_option("parallel.enable", True);
         if self.verbose > 0:
@@ -214,15 +227,27 @@ class InternalZ3:
         with util.timer() as elapsed:
             res = solver.check()
             time = elapsed()
+        if res == unknown and solver.reason_unknown() not in ('timeout', 'canceled'):
+            # the CEGIS loop takes a missing model as proof that no
+            # program of this size exists, so an incomplete solver must
+            # not be conflated with unsat. Timeouts still map to "no
+            # model found" as before.
+            raise Z3Exception(f'solver returned unknown: {solver.reason_unknown()}')
         model = solver.model() if res == sat else None
         return time, model
 
     def _create_solver(self, theory):
-        return SolverFor(theory) if theory else Solver()
+        s = SolverFor(theory) if theory else Solver()
+        if self.tune and get_param('parallel.enable') != 'true':
+            # the synthesis queries are ground, so relevancy propagation
+            # in the SMT core only adds bookkeeping. Set here and not in
+            # create() because the other backends (Optimize, tactic
+            # solvers) do not know this parameter; neither does the
+            # parallel engine that SolverFor returns in parallel mode.
+            s.set('smt.relevancy', 0)
+        return s
 
     def create(self, theory):
-        set_option("sat.random_seed", 0)
-        set_option("smt.random_seed", 0)
         s = self._create_solver(theory)
         # TODO: Experiment with that. Without this, AtMost and AtLease
         # constraints are translated down to boolean formulas.
@@ -237,7 +262,30 @@ class InternalZ3Opt(InternalZ3):
     def _create_solver(self, theory):
         return Optimize()
 
-_SOLVERS = InternalZ3 | ExternalZ3 | Yices | Bitwuzla | Cvc5
+@functools.cache
+def _bit_blast_tactic():
+    # building a tactic chain walks the tactic registry; cache the
+    # compiled chain so repeated solver creations (one per program
+    # size and CEGIS restart) reuse it
+    # blast_distinct lowers Distinct constraints in the simplifier;
+    # without it, bit-blast chokes on n-ary Distinct over bitvectors
+    # and the whole chain returns unknown
+    return Then(With('simplify', blast_distinct=True),
+                'propagate-values', 'solve-eqs',
+                'elim-uncnstr', 'card2bv', 'bit-blast', 'sat')
+
+@dataclass(frozen=True)
+class InternalZ3Tactic(InternalZ3):
+    """Z3 solver built from a hand-tuned tactic chain instead of the
+       default strategy. Falls back to the default solver for theories
+       that cannot be bit-blasted."""
+
+    def _create_solver(self, theory):
+        if theory in ('QF_BV', 'QF_FD'):
+            return _bit_blast_tactic().solver()
+        return super()._create_solver(theory)
+
+_SOLVERS = InternalZ3 | ExternalZ3 | Yices | Bitwuzla | Cvc5 | InternalZ3Tactic
 _OPT_SOLVERS = InternalZ3Opt
 
 @dataclass(frozen=True)
@@ -13,6 +13,7 @@ class Eval:
         self.inputs = inputs
         self.outputs = outputs
         self.solver = solver
+        self.sample_cache = {}
 
     def __call__(self, input_vals):
         s = self.solver
@@ -31,7 +32,11 @@ class Eval:
            The list may contain less than n elements if there
            are less than n unique inputs.
         """
-        res = []
+        # the samples don't depend on the caller, so they are computed
+        # once per n and reused across synthesis attempts
+        if (res := self.sample_cache.get(n)) is not None:
+            return res
+        res = self.sample_cache[n] = []
         s = self.solver
         s.push()
         for _ in range(n):
@@ -1,6 +1,6 @@
 from functools import lru_cache
 from collections import defaultdict
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from typing import Tuple
 
 from z3 import *
@@ -79,9 +79,17 @@ class _LenConstraints:
                        + [ self.n_outputs ]
 
         self.types = set(ty for op in ops for ty in op.out_types + op.in_types)
+        # types an operator instruction can produce
+        self.op_out_tys = frozenset(ty for op in ops for ty in op.out_types)
 
         # prepare operator enum sort
         self.op_enum = BitVecEnum('Operators', ops)
+        # (operator, id) pairs, precomputed once for the many loops below
+        self.op_items = tuple(self.op_enum.item_to_cons.items())
+        # the same pairs with the type signature attached, for the
+        # per-sample instance constraints
+        self.op_insts = tuple((op, op_id, op.out_type, op.in_types) \
+                              for op, op_id in self.op_items)
         # create map of types to their id
         self.ty_enum = BitVecEnum('Types', self.types)
 
@@ -91,6 +99,9 @@ class _LenConstraints:
         self.ln_sort = util.bv_sort(self.length - 1)
         self.bl_sort = BoolSort()
 
+        # variable cache for get_var, keyed by name and instance
+        self.vars = {}
+
         # set options
         self.d = options.debug
         self.n_samples = 0
@@ -102,25 +113,35 @@ class _LenConstraints:
         self.add_constr_opt()
         self.d(1, 'size', self.n_insns)
 
-    @lru_cache
     def get_var(self, ty, name, instance=None):
-        name = f'|{name}_{instance}|' if not instance is None else f'|{name}|'
-        return Const(name, ty)
+        # an explicit dict instead of lru_cache: the variable names are
+        # unique (they encode the sort where it matters), so hashing the
+        # Z3 sort on every lookup is unnecessary, and the pipe-quoted
+        # name is only formatted on a miss
+        if (res := self.vars.get((name, instance))) is None:
+            full = f'|{name}_{instance}|' if not instance is None else f'|{name}|'
+            res = self.vars[(name, instance)] = Const(full, ty)
+        return res
 
     def var_insn_op(self, insn):
         return self.get_var(self.op_sort, f'insn_{insn}_op')
 
+    # the per-instruction variable lists are requested over and over
+    # (once per constraint family and once per instance), so they return
+    # cached tuples instead of re-deriving the variables each time
+    @lru_cache
     def var_insn_opnds_is_const(self, insn):
-        for opnd in range(self.arities[insn]):
-            yield self.get_var(self.bl_sort, f'insn_{insn}_opnd_{opnd}_is_const')
+        return tuple(self.get_var(self.bl_sort, f'insn_{insn}_opnd_{opnd}_is_const') \
+                     for opnd in range(self.arities[insn]))
 
     def var_insn_op_opnds_const_val(self, insn, opnd_tys):
         for opnd, ty in enumerate(opnd_tys):
             yield self.get_var(ty, f'insn_{insn}_opnd_{opnd}_{ty}_const_val')
 
+    @lru_cache
     def var_insn_opnds(self, insn):
-        for opnd in range(self.arities[insn]):
-            yield self.get_var(self.ln_sort, f'insn_{insn}_opnd_{opnd}')
+        return tuple(self.get_var(self.ln_sort, f'insn_{insn}_opnd_{opnd}') \
+                     for opnd in range(self.arities[insn]))
 
     def var_insn_opnds_val(self, insn, tys, instance):
         for opnd, ty in enumerate(tys):
@@ -130,9 +151,10 @@ class _LenConstraints:
         for opnd in self.var_insn_opnds_val(self.out_insn, self.out_tys, instance):
             yield opnd
 
+    @lru_cache
     def var_insn_opnds_type(self, insn):
-        for opnd in range(self.arities[insn]):
-            yield self.get_var(self.ty_sort, f'insn_{insn}_opnd_type_{opnd}')
+        return tuple(self.get_var(self.ty_sort, f'insn_{insn}_opnd_type_{opnd}') \
+                     for opnd in range(self.arities[insn]))
 
     def var_insn_res(self, insn, ty, instance):
         return self.get_var(ty, f'insn_{insn}_res_{ty}', instance)
@@ -166,20 +188,22 @@ class _LenConstraints:
                 self.var_insn_op_opnds_const_val(insn, tys))
 
     def add_constr_insn_count(self):
+        cons = []
         # constrain the number of usages of an operator if specified
-        for op, op_cons in self.op_enum.item_to_cons.items():
+        for op, op_cons in self.op_items:
             if not (f := self.ops[op]) is None:
                 a = [ self.var_insn_op(insn) == op_cons \
                     for insn in range(self.n_inputs, self.length - 1) ]
                 if a:
-                    self.synth.add(AtMost(*a, f))
+                    cons += [ AtMost(*a, f) ]
                     if self.options.exact:
-                        self.synth.add(AtLeast(*a, f))
+                        cons += [ AtLeast(*a, f) ]
+        self.synth.add(cons)
 
     def add_constr_const_count(self):
         const_map = self.task.const_map
         max_const = self.task.max_const
-        solver    = self.synth
+        cons      = []
 
         # If supplied with an empty set of constants, we don't allow any constants
         if not const_map is None and len(const_map) == 0:
@@ -188,8 +212,8 @@ class _LenConstraints:
         # Add a constraint for the maximum amount of constants if specified.
         ran = range(self.n_inputs, self.length)
         if not max_const is None and len(ran) > 0:
-            solver.add(AtMost(*[ v for insn in ran \
-                       for v in self.var_insn_opnds_is_const(insn)], max_const))
+            cons += [ AtMost(*[ v for insn in ran \
+                      for v in self.var_insn_opnds_is_const(insn)], max_const) ]
 
         # limit the possible set of constants if desired
         if const_map:
@@ -199,37 +223,61 @@ class _LenConstraints:
                 ty_const_map[c.sort()].append((c, n))
             for insn in range(self.n_inputs, self.length):
                 for ty in self.types:
-                    for _, _, c, cv in self.iter_opnd_info_struct(insn, [ ty ] * self.max_arity):
-                        eqs = []
-                        for v, _ in ty_const_map[ty]:
-                            eqs += [ cv == v ]
-                            const_constr_map[v] += [ And([c, cv == v ]) ]
-                        solver.add(Implies(c, Or(eqs)))
+                    consts = ty_const_map[ty]
+                    it = enumerate(self.iter_opnd_info_struct(insn, [ ty ] * self.max_arity))
+                    for opnd, (_, _, c, cv) in it:
+                        if not consts:
+                            # no constants of this type are allowed
+                            cons += [ Not(c) ]
+                            continue
+                        # select the constant through a small index
+                        # variable: the solver then reasons over an
+                        # index of a few bits instead of a disjunction
+                        # of full-width value equations
+                        idx = self.get_var(util.bv_sort(len(consts)), \
+                                f'insn_{insn}_opnd_{opnd}_{ty}_const_idx')
+                        cons += [ Implies(c, ULT(idx, len(consts))) ]
+                        for k, (v, _) in enumerate(consts):
+                            sel = And([ c, idx == k ])
+                            cons += [ Implies(sel, cv == v) ]
+                            const_constr_map[v] += [ sel ]
             for c, constr in const_constr_map.items():
                 if not (n := const_map[c]) is None:
-                    solver.add(AtMost(*constr, n))
+                    cons += [ AtMost(*constr, n) ]
                     if self.options.exact:
-                        solver.add(AtLeast(*constr, n))
+                        cons += [ AtLeast(*constr, n) ]
+        self.synth.add(cons)
 
     def add_constr_wfp(self):
-        solver = self.synth
+        # batch up the constraints and hand them to the solver in one
+        # add call; asserting them one by one spends most of the time in
+        # the FFI for larger programs
+        cons = []
         # acyclic: line numbers of uses are lower than line number of definition
         # i.e.: we can only use results of preceding instructions
         for insn in range(self.length):
             for v in self.var_insn_opnds(insn):
-                solver.add(ULT(v, insn))
+                cons += [ ULT(v, insn) ]
         # Add bounds for the operand ids
         for insn in range(self.n_inputs, self.length - 1):
-            self.op_enum.add_range_constr(solver, self.var_insn_op(insn))
+            cons += [ ULT(self.var_insn_op(insn), len(self.op_enum)) ]
         # Add a constraint that pins potentially unused operands to the last
         # one. This is important because otherwise the no_dead_code constraints
-        # will not work.
+        # will not work. Operators of the same arity pin the same operands,
+        # so emit one constraint per arity class instead of one per operator.
+        ids_by_arity = defaultdict(list)
+        for op, op_id in self.op_items:
+            if op.arity < self.max_arity:
+                ids_by_arity[op.arity].append(op_id)
         for insn in range(self.n_inputs, self.length - 1):
-            for op, op_id in self.op_enum.item_to_cons.items():
-                if op.arity < self.max_arity:
-                    opnds = list(self.var_insn_opnds(insn))
-                    self.synth.add(Implies(self.var_insn_op(insn) == op_id, \
-                        And([ opnds[op.arity - 1] == x for x in opnds[op.arity:] ])))
+            op_var = self.var_insn_op(insn)
+            opnds  = self.var_insn_opnds(insn)
+            for arity, op_ids in ids_by_arity.items():
+                sel = Or([ op_var == i for i in op_ids ]) \
+                      if len(op_ids) > 1 else op_var == op_ids[0]
+                cons += [ Implies(sel, \
+                    And([ opnds[arity - 1] == x for x in opnds[arity:] ])) ]
+        self.synth.add(cons)
         # Add constraints on the instruction counts
         self.add_constr_insn_count()
         # Add constraints on constant usage
@@ -240,27 +288,38 @@ class _LenConstraints:
             # we don't need constraints if there is only one type
             return
 
-        solver = self.synth
+        cons = []
         # for all instructions that get an op
         # add constraints that set the type of an instruction's operand
         # and the result type of an instruction
         types = self.ty_enum.item_to_cons
         for insn in range(self.n_inputs, self.length - 1):
-            for op, op_id in self.op_enum.item_to_cons.items():
+            for op, op_id in self.op_items:
                 # add constraints that set the result type of each instruction
-                solver.add(Implies(self.var_insn_op(insn) == op_id, \
-                                   self.var_insn_res_type(insn) == types[op.out_type]))
+                cons += [ Implies(self.var_insn_op(insn) == op_id, \
+                                  self.var_insn_res_type(insn) == types[op.out_type]) ]
                 # add constraints that set the type of each operand
                 for op_ty, v in zip(op.in_types, self.var_insn_opnds_type(insn)):
-                    solver.add(Implies(self.var_insn_op(insn) == op_id, v == types[op_ty]))
+                    cons += [ Implies(self.var_insn_op(insn) == op_id, v == types[op_ty]) ]
 
         # define types of inputs
         for inp, ty in enumerate(self.in_tys):
-            solver.add(self.var_insn_res_type(inp) == types[ty])
+            cons += [ self.var_insn_res_type(inp) == types[ty] ]
 
         # define types of outputs
         for v, ty in zip(self.var_insn_opnds_type(self.out_insn), self.out_tys):
-            solver.add(v == types[ty])
+            cons += [ v == types[ty] ]
+
+        # the result type of a producer is statically known for inputs
+        # and, if all operators produce the same type, for the operator
+        # instructions as well; use the type id directly in those cases
+        # instead of going through the result type variable
+        op_res_ty = types[next(iter(self.op_out_tys))] \
+                    if len(self.op_out_tys) == 1 else None
+        res_ty_of = [ types[ty] for ty in self.in_tys ]
+        for other in range(self.n_inputs, self.length - 1):
+            res_ty_of.append(op_res_ty if not op_res_ty is None \
+                             else self.var_insn_res_type(other))
 
         # constrain types of outputs
         for insn in range(self.n_inputs, self.length):
@@ -268,12 +327,13 @@ class _LenConstraints:
                 for opnd, c, ty in zip(self.var_insn_opnds(insn), \
                                     self.var_insn_opnds_is_const(insn), \
                                     self.var_insn_opnds_type(insn)):
-                    solver.add(Implies(Not(c), Implies(opnd == other, \
-                                    ty == self.var_insn_res_type(other))))
-            self.ty_enum.add_range_constr(solver, self.var_insn_res_type(insn))
+                    cons += [ Implies(Not(c), Implies(opnd == other, \
+                                    ty == res_ty_of[other])) ]
+            cons += [ ULT(self.var_insn_res_type(insn), len(self.ty_enum)) ]
+        self.synth.add(cons)
 
     def add_constr_opt(self):
-        solver = self.synth
+        cons = []
 
         def opnd_set(insn):
             sz  = self.length + (self.op_sort.size() if self.options.opt_insn_order_op else 0)
@@ -290,19 +350,25 @@ class _LenConstraints:
 
         if self.options.opt_insn_order:
             for insn in range(self.n_inputs, self.out_insn - 1):
-                solver.add(ULE(opnd_set(insn), opnd_set(insn + 1)))
+                cons += [ ULE(opnd_set(insn), opnd_set(insn + 1)) ]
 
         for insn in range(self.n_inputs, self.out_insn):
             op_var = self.var_insn_op(insn)
-            for op, op_id in self.op_enum.item_to_cons.items():
+            opnds  = self.var_insn_opnds(insn)
+            consts = self.var_insn_opnds_is_const(insn)
+            for op, op_id in self.op_items:
                 # if operator is commutative, force the operands to be in ascending order
                 if self.options.opt_commutative and op.is_commutative:
-                    opnds = list(self.var_insn_opnds(insn))
-                    c = [ ULE(l, u) for l, u in zip(opnds[:op.arity - 1], opnds[1:]) ]
-                    solver.add(Implies(op_var == op_id, And(c)))
+                    if op.arity == 2:
+                        # by far the most common case
+                        c = ULE(opnds[0], opnds[1])
+                    else:
+                        c = And([ ULE(l, u) for l, u in \
+                                  zip(opnds[:op.arity - 1], opnds[1:]) ])
+                    cons += [ Implies(op_var == op_id, c) ]
 
                 if self.options.opt_const:
-                    vars = [ v for v in self.var_insn_opnds_is_const(insn) ][:op.arity]
+                    vars = consts[:op.arity]
                     assert len(vars) > 0
                     if op.arity == 2 and op.is_commutative:
                         # Binary commutative operators have at most one constant operand
@@ -311,42 +377,57 @@ class _LenConstraints:
                     else:
                         # Otherwise, we require that at least one operand is non-constant
                         not_const = And(vars)
-                    solver.add(Implies(op_var == op_id, Not(not_const)))
+                    cons += [ Implies(op_var == op_id, Not(not_const)) ]
 
             # Computations must not be replicated: If an operation appears again
             # in the program, at least one of the operands must be different from
             # a previous occurrence of the same operation.
             if self.options.opt_cse:
                 for other in range(self.n_inputs, insn):
-                    un_eq = [ p != q for p, q in zip(self.var_insn_opnds(insn), \
-                                                     self.var_insn_opnds(other)) ]
+                    un_eq = [ p != q for p, q in \
+                              zip(opnds, self.var_insn_opnds(other)) ]
                     assert len(un_eq) > 0
-                    solver.add(Implies(op_var == self.var_insn_op(other), Or(un_eq)))
+                    cons += [ Implies(op_var == self.var_insn_op(other), Or(un_eq)) ]
 
         # no dead code: each produced value is used
         if self.options.opt_no_dead_code:
+            # the (non-const, operand) pairs of a consumer are the same
+            # for every producer, so build them (and the Not nodes) once
+            # instead of per producer/consumer combination
+            uses = [ [ (Not(c), v) \
+                       for c, v in zip(self.var_insn_opnds_is_const(consumer), \
+                                       self.var_insn_opnds(consumer)) ] \
+                     for consumer in range(self.length) ]
             for prod in range(self.n_inputs, self.out_insn):
-                opnds = [ And([ prod == v, Not(c) ]) \
-                            for cons in range(prod + 1, self.length) \
-                            for c, v in zip(self.var_insn_opnds_is_const(cons), \
-                                            self.var_insn_opnds(cons)) ]
+                opnds = [ And([ prod == v, nc ]) \
+                            for consumer in range(prod + 1, self.length) \
+                            for nc, v in uses[consumer] ]
                 if len(opnds) > 0:
-                    solver.add(Or(opnds))
+                    cons += [ Or(opnds) ]
+        self.synth.add(cons)
 
-    def add_constr_conn(self, insn, tys, instance):
+    def add_constr_conn(self, insn, tys, instance, cons):
         for ty, l, v, c, cv in self.iter_opnd_info(insn, tys, instance):
             # if the operand is a constant, its value is the constant value
-            self.synth.add(Implies(c, v == cv))
-            # else, for other each instruction preceding it ...
+            cons += [ Implies(c, v == cv) ]
+            # else, for each instruction preceding it ...
             for other in range(insn):
+                # ... that can produce a value of the operand's type
+                # (the type constraints forbid pointing at the rest, so
+                # tying their result variables would be dead weight)
+                if other < self.n_inputs:
+                    if self.in_tys[other] != ty:
+                        continue
+                elif self.is_op_insn(other) and not ty in self.op_out_tys:
+                    continue
                 r = self.var_insn_res(other, ty, instance)
                 # ... the operand is equal to the result of the instruction
-                self.synth.add(Implies(Not(c), Implies(l == other, v == r)))
+                cons += [ Implies(Not(c), Implies(l == other, v == r)) ]
 
     def add_constr_opt_instance(self, instance):
         for insn in range(self.n_inputs, self.length - 1):
             # add constraints to select the proper operation
-            for op in self.op_enum.item_to_cons:
+            for op, _ in self.op_items:
                 res = self.var_insn_res(insn, op.out_type, instance)
 
                 # forbid constant expressions that are not constant
@@ -377,12 +458,12 @@ class _LenConstraints:
     def add_cross_instance_constr(self, last_instance):
         if self.options.no_const_expr and last_instance > 0:
             for insn in range(self.n_inputs, self.length - 1):
-                for op in self.op_enum.item_to_cons:
+                for op, _ in self.op_items:
                     self.synth.add(self.var_not_all_eq(insn, op.out_type, last_instance))
 
         if self.options.no_semantic_eq:
             for insn in range(self.n_inputs, self.length - 1):
-                for op in self.op_enum.item_to_cons:
+                for op, _ in self.op_items:
                     for other in range(0, insn):
                         for other_op in self.op_enum.item_to_cons:
                             if other_op.out_type != op.out_type:
@@ -390,41 +471,47 @@ class _LenConstraints:
                             self.synth.add(self.var_not_eq_pair(insn, other, op.out_type, last_instance))
 
     def add_constr_instance(self, instance):
+        cons = []
         # for all instructions that get an op
         for insn in range(self.n_inputs, self.length - 1):
             # add constraints to select the proper operation
             op_var = self.var_insn_op(insn)
-            for op, op_id in self.op_enum.item_to_cons.items():
-                res = self.var_insn_res(insn, op.out_type, instance)
-                opnds = list(self.var_insn_opnds_val(insn, op.in_types, instance))
+            for op, op_id, out_type, in_types in self.op_insts:
+                res = self.var_insn_res(insn, out_type, instance)
+                opnds = list(self.var_insn_opnds_val(insn, in_types, instance))
                 precond, phi = op.instantiate([ res ], opnds)
-                self.synth.add(Implies(op_var == op_id, And([ precond, phi ])))
+                # most operators have no precondition; don't drag a
+                # trivially true conjunct through every instance
+                rhs = phi if is_true(precond) else And([ precond, phi ])
+                cons += [ Implies(op_var == op_id, rhs) ]
             # connect values of operands to values of corresponding results
             for ty in self.types:
-                self.add_constr_conn(insn, [ ty ] * self.max_arity, instance)
+                self.add_constr_conn(insn, [ ty ] * self.max_arity, instance, cons)
         # add connection constraints for output instruction
-        self.add_constr_conn(self.out_insn, self.out_tys, instance)
+        self.add_constr_conn(self.out_insn, self.out_tys, instance, cons)
+        self.synth.add(cons)
 
     def add_constr_io_sample(self, instance, in_vals, out_vals):
         # add input value constraints
         assert len(in_vals) == self.n_inputs and len(out_vals) == self.n_outputs
-        for inp, val in enumerate(in_vals):
-            assert not val is None
-            res = self.var_input_res(inp, instance)
-            self.synth.add(res == val)
-        for out, val in zip(self.var_outs_val(instance), out_vals):
-            assert not val is None
-            self.synth.add(out == val)
+        assert all(not val is None for val in in_vals)
+        assert all(not val is None for val in out_vals)
+        cons  = [ self.var_input_res(inp, instance) == val \
+                  for inp, val in enumerate(in_vals) ]
+        cons += [ out == val \
+                  for out, val in zip(self.var_outs_val(instance), out_vals) ]
+        self.synth.add(cons)
 
     def add_constr_io_spec(self, instance, in_vals):
         # add input value constraints
         assert len(in_vals) == self.n_inputs
         assert all(not val is None for val in in_vals)
-        for inp, val in enumerate(in_vals):
-            self.synth.add(val == self.var_input_res(inp, instance))
+        cons = [ val == self.var_input_res(inp, instance) \
+                 for inp, val in enumerate(in_vals) ]
         outs = [ v for v in self.var_outs_val(instance) ]
         precond, phi = self.spec.instantiate(outs, in_vals)
-        self.synth.add(And([ precond, phi ]))
+        cons += [ And([ precond, phi ]) ]
+        self.synth.add(cons)
 
     def create_prg(self, model):
         s = self.orig_spec
@@ -502,6 +589,9 @@ class _LenBase(util.HasDebug, solvers.HasSolver):
     size_range: Tuple[int, int] = (0, 10)
     """Range of program sizes to try."""
 
+    bisect: bool = False
+    """Bisect over the program size instead of enumerating it linearly."""
+
     def synth_all(self, task: Task):
         self.debug(2, task)
         if self.exact:
@@ -518,10 +608,45 @@ class _LenBase(util.HasDebug, solvers.HasSolver):
                     yield prg, all_stats
 
     def synth(self, task: Task):
+        if self.bisect and not self.exact:
+            return self.synth_bisect(task)
         for prg, stats in self.synth_all(task):
             return prg, stats
         return None, []
 
+    def synth_bisect(self, task: Task):
+        # "is there a program with n instructions" is not monotone in n
+        # because every instruction must carry an operator and the
+        # operator counts are bounded. Pad the library with an id
+        # operator (as OptCegis does) so that shorter programs embed
+        # into longer ones and feasibility becomes monotone; then the
+        # minimal size can be found with log instead of linearly many
+        # solver calls.
+        id = Func('id', task.spec.outputs[0])
+        ops = dict(task.ops)
+        ops[id] = None
+        padded = task.copy_with_different_ops(ops)
+
+        all_stats = []
+        def probe(n_insns):
+            synth = self.create_synth(padded, n_insns)
+            with util.timer() as elapsed:
+                prg, stats = synth.synth_prg()
+                all_stats.append({ 'time': elapsed(), 'size': n_insns, \
+                                   'iterations': stats })
+            return prg
+
+        lo, hi = self.size_range
+        if (best := probe(hi)) is None:
+            return None, all_stats
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if (prg := probe(mid)) is not None:
+                best, hi = prg, mid
+            else:
+                lo = mid + 1
+        return best, all_stats
+
 class _LenCegis(_LenConstraints, CegisBaseSynth, AllPrgSynth):
     def __init__(self, options, task: Task, n_insns: int):
         CegisBaseSynth.__init__(self, task.spec, options.debug)
@@ -640,7 +765,7 @@ class _OptCegis(_LenCegis, AllPrgSynth):
             # get operator of instruction
             op_var = self.var_insn_op(insn)
             # if operator is id AND  >=one of the operands is a constant
-            cond = And(op_var == id_id, Or([var == True for var in self.var_insn_opnds_is_const(insn)]))
+            cond = And(op_var == id_id, Or(list(self.var_insn_opnds_is_const(insn))))
             # then every previous instruction may not be id
             cons = [ self.var_insn_op(f_insn) != id_id for f_insn in range(self.n_inputs, insn)]
             solver.add(Implies(cond, And(cons)))
@@ -725,12 +850,14 @@ class _ConstantSolver:
 class _CegisConstantSolver(_ConstantSolver, CegisBaseSynth):
     """Synthesizer that implements CEGIS solver interface to find the constants in the program."""
 
-    def __init__(self, options, task: Task, base_program: Prg):
+    def __init__(self, options, task: Task, base_program: Prg, init_samples=None):
         CegisBaseSynth.__init__(self, task.spec, options.debug)
         _ConstantSolver.__init__(self, options, task, base_program)
 
         # add initial samples
-        for s in task.spec.eval.sample_n(1):
+        if not init_samples:
+            init_samples = task.spec.eval.sample_n(1)
+        for s in init_samples:
             self._add_sample(s)
 
     def add_cross_instance_constr(self, instance):
@@ -804,19 +931,54 @@ class Downscale(LenCegis):
     target_bitwidth: list[int] = field(default_factory=lambda: [4, 8])
     """Comma separated list of target bitwidths (integer) to scale down to."""
 
+    pilot_solver: solvers._SOLVERS = solvers.InternalZ3Tactic()
+    """Solver for the scaled-down pilot synthesis. The pilot is a pure
+       small-width bitvector problem, so it defaults to the solver built
+       from the bit-blasting tactic chain."""
+
+    pilot_parallel: bool = False
+    """Enable Z3's parallel mode for the pilot only. The pilot's checks
+       are SAT-heavy one-shots that parallelize well; the short
+       incremental queries of the constant solver do not."""
+
     constant_finder_use_cegis: bool = True
     """Whether to use CEGIS to find the constants in the upscaling process."""
 
     keep_const_map: bool = False
     """Whether to keep the constant map for the downscaling process."""
 
+    def _pilot_synth(self, pilot, task: Task):
+        # like _LenBase.synth, but holds on to the CEGIS instance of the
+        # successful size so its counterexample samples can be harvested
+        l, h = pilot.size_range
+        all_stats = []
+        for n_insns in range(l, h + 1):
+            synth = pilot.create_synth(task, n_insns)
+            with util.timer() as elapsed:
+                prg, stats = synth.synth_prg()
+            all_stats += [ { 'time': elapsed(), 'iterations': stats } ]
+            if not prg is None:
+                return prg, all_stats, synth.samples
+        return None, all_stats, []
+
     def synth(self, task: Task):
         combined_stats = []
 
+        # the pilot synthesizer is this synthesizer with the pilot solver
+        pilot = replace(self, solver=self.pilot_solver)
+
+        # the pilot only makes sense for bitvector specs; without any BV
+        # sort the downscaling transform (and the pilot run after it) is
+        # dead work, so fall through to normal synthesis directly
+        if not any(is_bv_sort(ty) for ty in task.spec.in_types + task.spec.out_types):
+            target_bitwidths = []
+        else:
+            target_bitwidths = self.target_bitwidth
+
         # try to downscale
         # for target_bitwidth in self.target_bitwidth.split(","):
         #     target_bw = int(target_bitwidth)
-        for target_bw in self.target_bitwidth:
+        for target_bw in target_bitwidths:
             # scale down the task
             try:
                 scaled_task = transform_task_to_bitwidth(task, target_bw, self.keep_const_map)
@@ -824,13 +986,43 @@ class Downscale(LenCegis):
                 self.debug(1, f"Failed to scale down the task to bitwidth {target_bw}: {e}")
                 continue
 
-            # run the synthesis on the scaled task
-            prg, stats = super().synth(scaled_task.transformed_task)
+            # run the synthesis on the scaled task; keep the CEGIS
+            # counterexamples so they can be reused at full width
+            if self.pilot_parallel:
+                # parallel.enable is a global setting, so remember its
+                # value (the main solver may have enabled it already)
+                # and restore it after the pilot
+                prev_parallel = get_param('parallel.enable')
+                set_option('parallel.enable', True)
+            try:
+                prg, stats, pilot_samples = self._pilot_synth(pilot, scaled_task.transformed_task)
+            finally:
+                if self.pilot_parallel:
+                    set_option('parallel.enable', prev_parallel == 'true')
+            # tag the pilot's stats with the bitwidth so a stats dump
+            # shows which pilots produced a program and which failed
+            for s in stats:
+                s['bitwidth'] = target_bw
             combined_stats += stats
             if prg is None:
-                self.debug(2, f"Failed to synthesize a program for bitwidth {target_bw}")
+                self.debug(1, f"Failed to synthesize a program for bitwidth {target_bw}")
                 continue
 
+            # seed the constant solver with the pilot's counterexamples,
+            # zero-extended to the original width. A zero-extended
+            # sample may violate the full-width precondition (the spec
+            # need not be total), in which case it must be dropped:
+            # asserting it would make the constant solver unsatisfiable.
+            spec = task.spec
+            init_samples = []
+            for sample in pilot_samples:
+                up = [ BitVecVal(v.as_long(), ty.size()) \
+                       if is_bv_sort(ty) and is_bv_value(v) else v \
+                       for v, ty in zip(sample, spec.in_types) ]
+                pre = substitute(spec.precond, list(zip(spec.inputs, up)))
+                if is_true(simplify(pre)):
+                    init_samples += [ up ]
+
             # scale up
             # revert to original operators
             prg = scaled_task.prg_with_original_operators(prg)
@@ -839,7 +1031,7 @@ class Downscale(LenCegis):
 
                 if (self.constant_finder_use_cegis):
                     # find the constants using CEGIS
-                    prg, stats = _CegisConstantSolver(self, task, prg).synth_prg()
+                    prg, stats = _CegisConstantSolver(self, task, prg, init_samples).synth_prg()
                 else:
                     # find the constants using FA
                     solver = _FAConstantSolver(self, task, prg)
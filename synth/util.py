@@ -2,13 +2,17 @@ import time
 
 from contextlib import contextmanager
 from dataclasses import dataclass, field
+from functools import lru_cache
 
 from z3 import BitVecSort
 
 def eval_model(model, vars):
     return [ model.evaluate(v, model_completion=True) for v in vars ]
 
+@lru_cache
 def bv_sort(max_value, ctx=None):
+    # memoized: sort construction crosses the Z3 FFI and the same few
+    # widths are requested over and over during encoding
     return BitVecSort(len(bin(max_value)) - 2, ctx=ctx)
 
 @contextmanager